@@ -0,0 +1,56 @@
+import re
+
+# Parts of speech whose chunks ("it", "they", "this") can't stand in for an answer on their own
+NON_CONTENT_POS = {"PRON", "DET"}
+
+QUESTION_STOPWORDS = {"what", "which", "when", "where", "whose", "does", "that", "this", "with", "from", "have", "were", "there"}
+
+
+class Answer(str):
+    """Answer span text that remembers the part of speech of its chunk's root."""
+
+    def __new__(cls, text, root_pos=None):
+        answer = super().__new__(cls, text)
+        answer.root_pos = root_pos
+        return answer
+
+
+def select_answers(chunks, max_answers, seen=None):
+    seen = set() if seen is None else seen
+    answers = []
+    for chunk in chunks:
+        c = chunk.text.strip()
+        if c.lower() not in seen and 1 <= len(c.split()) <= 5:
+            seen.add(c.lower())
+            answers.append(Answer(c, chunk.root.pos_))
+        if len(answers) >= max_answers:
+            break
+    return answers
+
+
+def _find_word(phrase, text):
+    return re.search(rf"(?<!\w){re.escape(phrase)}(?!\w)", text, re.IGNORECASE)
+
+
+def align_answer(answer, question, context):
+    """Return the answer span as written in the context if it can replace a QA decode.
+
+    The span must be a content chunk (not a bare pronoun or determiner), must
+    occur in the context as whole words, must not be given away by the
+    question, and the question must share a content word with the sentence
+    the span is in. Otherwise returns None.
+    """
+    if getattr(answer, "root_pos", None) in NON_CONTENT_POS:
+        return None
+    match = _find_word(answer, context)
+    if match is None or _find_word(answer, question) is not None:
+        return None
+    start, end = match.span()
+    lowered = context.lower()
+    sent_start = max(lowered.rfind(p, 0, start) for p in ".!?") + 1
+    sent_end = min((i for i in (lowered.find(p, end) for p in ".!?") if i >= 0), default=len(lowered))
+    sentence_words = set(re.findall(r"\w+", lowered[sent_start:sent_end]))
+    question_words = {w for w in re.findall(r"\w+", question.lower()) if len(w) > 3 and w not in QUESTION_STOPWORDS}
+    if not question_words & sentence_words:
+        return None
+    return context[start:end]
@@ -0,0 +1,94 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchScheduler:
+    """Collects prompts from concurrent requests into padded batches.
+
+    A single background thread takes the first pending prompt, waits up to
+    ``max_wait_ms`` for more to arrive (or until ``max_batch_size`` is
+    reached) and runs them through ``run_batch`` in one forward pass. Each
+    caller gets its own output back through a future.
+
+    The time each prompt waited between ``submit`` and the start of its batch
+    is passed to ``observe`` and averaged in ``stats``.
+    """
+
+    def __init__(self, run_batch, max_batch_size=8, max_wait_ms=5.0, name="batch", observe=None):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.observe = observe
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.prompts = 0
+        self.wait_seconds = 0.0
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name=f"{self.name}-scheduler", daemon=True)
+                self._thread.start()
+
+    def submit(self, prompt):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((prompt, future, time.monotonic()))
+        return future
+
+    def map(self, prompts):
+        futures = [self.submit(p) for p in prompts]
+        return [f.result() for f in futures]
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            started = time.monotonic()
+            waits = [started - submitted for _, _, submitted in batch]
+            if self.observe is not None:
+                for wait in waits:
+                    self.observe(wait)
+            prompts = [p for p, _, _ in batch]
+            try:
+                outputs = self.run_batch(prompts)
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.prompts += len(batch)
+            self.wait_seconds += sum(waits)
+            for (_, future, _), out in zip(batch, outputs):
+                future.set_result(out)
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "prompts": self.prompts,
+            "avg_batch_size": self.prompts / self.batches if self.batches else 0.0,
+            "avg_wait_ms": self.wait_seconds / self.prompts * 1000 if self.prompts else 0.0,
+            "pending": self._queue.qsize(),
+        }
@@ -0,0 +1,88 @@
+"""Compare per-prompt generation against the cross-request batch scheduler.
+
+Runs the fixed corpus through ``main.build_flashcards`` from N concurrent
+threads, once with ``INFERENCE_BATCHING`` off and once on, and prints
+throughput and latency percentiles for each. Needs the real model weights,
+unless --stub swaps in the models from bench/stubs.py; give those a fixed
+cost per generate call with BENCH_STUB_CALL_MS (and per prompt with
+BENCH_STUB_PROMPT_MS) to see what batching saves.
+
+    python -m bench.batching --concurrency 1 4 8 --rounds 3
+    BENCH_STUB_CALL_MS=20 BENCH_STUB_PROMPT_MS=2 python -m bench.batching --stub
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+
+import main
+from bench.corpus import TEXTS
+from bench.load import percentile
+
+
+def run(concurrency, rounds, num_questions):
+    jobs = [t for _ in range(rounds) for t in TEXTS]
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if not jobs:
+                    return
+                text = jobs.pop()
+            start = time.perf_counter()
+            main.build_flashcards(text, num_questions)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    return {
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--num-questions", type=int, default=2)
+    parser.add_argument("--stub", action="store_true", help="use the stub models from bench/stubs.py")
+    args = parser.parse_args()
+
+    if args.stub:
+        from bench import stubs
+
+        stubs.install(main)
+
+    # Load weights and warm up outside the timed region
+    main.build_flashcards(TEXTS[0], args.num_questions)
+
+    results = []
+    for concurrency in args.concurrency:
+        for batching in (False, True):
+            main.BATCHING = batching
+            row = {"concurrency": concurrency, "batching": batching}
+            row.update(run(concurrency, args.rounds, args.num_questions))
+            results.append(row)
+            print(
+                f"concurrency={concurrency:<3} batching={'on ' if batching else 'off'} "
+                f"rps={row['throughput_rps']:.2f} p50={row['p50_ms']:.0f}ms p95={row['p95_ms']:.0f}ms"
+            )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
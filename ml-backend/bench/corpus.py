@@ -0,0 +1,15 @@
+# Fixed inputs for benchmarks and parity checks; each fits InputText (<= 500 chars)
+TEXTS = [
+    "The mitochondria is the powerhouse of the cell. It produces adenosine triphosphate through cellular respiration, which the cell uses as its main source of chemical energy.",
+    "Photosynthesis takes place in the chloroplasts of plant cells. Chlorophyll absorbs sunlight and converts carbon dioxide and water into glucose and oxygen.",
+    "The French Revolution began in 1789 with the storming of the Bastille. It abolished the monarchy and led to the rise of Napoleon Bonaparte.",
+    "Newton's second law states that the force acting on an object equals its mass times its acceleration. The unit of force is the newton.",
+    "The Pacific Ocean is the largest and deepest ocean on Earth. The Mariana Trench, its deepest point, reaches nearly eleven kilometres below sea level.",
+    "DNA is a double helix made of two strands of nucleotides. Each nucleotide contains a sugar, a phosphate group and one of four nitrogenous bases.",
+    "The Great Wall of China was built over many centuries to protect Chinese states from nomadic invasions. Most of the existing wall dates from the Ming dynasty.",
+    "Supply and demand determine the market price of a good. When demand rises and supply stays the same, the equilibrium price increases.",
+    "Python is a high-level programming language created by Guido van Rossum. It emphasises code readability and supports multiple programming paradigms.",
+    "The human heart has four chambers: two atria and two ventricles. The left ventricle pumps oxygenated blood into the aorta and on to the rest of the body.",
+    "Shakespeare wrote Hamlet around 1600. The play follows Prince Hamlet as he seeks revenge against his uncle Claudius for the murder of his father.",
+    "Water boils at one hundred degrees Celsius at sea level. At higher altitudes the lower air pressure makes water boil at a lower temperature.",
+]
@@ -0,0 +1,412 @@
+"""Offline benchmark and load test for ml-backend.
+
+Drives POST /generate with the fixed corpus at several concurrency levels,
+either in-process (requests are handed straight to the ASGI app), against
+a local uvicorn server, or against gunicorn with gunicorn.conf.py started
+for the run. Reports throughput, p50/p95/p99 latency, peak RSS and
+cold-start time, and writes JSON that can be diffed between commits.
+
+    python -m bench.load --mode inprocess --stub --output before.json
+    python -m bench.load --mode server --concurrency 1 4 16 --output after.json --baseline before.json
+    INFERENCE_BACKEND=torch-int8 python -m bench.load --mode gunicorn --preload 0 1
+
+--mode gunicorn starts the server once per --preload setting
+(PRELOAD_MODELS), records the time from spawn to the first 200 from
+POST /generate, then polls /ready until all WEB_CONCURRENCY workers have
+answered and records each one's PSS/RSS and the master's PSS. A worker is
+only ready after it has run a warmup generation, so every worker reporting
+ready also shows that torch (and its OpenMP pool) works after fork, which
+is worth checking with the torch-int8 backend, where the master runs
+quantize_dynamic before forking.
+
+The result cache is bypassed unless --cache is given (RESULT_CACHE_ENABLED=0
+turns off single-flight coalescing as well as storage), so repeated corpus
+texts are actually computed even when identical ones are in flight together. --stub swaps get_nlp()/get_qa_qg_pipeline()
+for the models in bench/stubs.py, which measures request-path overhead
+without weights or network access.
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.corpus import TEXTS
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def request_bodies(count, num_questions):
+    return [{"text": TEXTS[i % len(TEXTS)], "num_questions": num_questions} for i in range(count)]
+
+
+def summarize(concurrency, results, wall):
+    latencies = [elapsed for status, _, elapsed in results if status == 200]
+    cards = sum(n for status, n, _ in results if status == 200)
+    statuses = {}
+    for status, _, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "concurrency": concurrency,
+        "requests": len(results),
+        "statuses": statuses,
+        "throughput_rps": len(latencies) / wall,
+        "cards_per_second": cards / wall,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def count_cards(status, body):
+    return len(json.loads(body).get("flashcards", [])) if status == 200 else 0
+
+
+# In-process: call the ASGI app directly, no sockets involved
+async def asgi_post(app, path, body):
+    payload = json.dumps(body).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    delivered = False
+    response = {"status": None, "body": b""}
+
+    async def receive():
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["body"]
+
+
+async def run_inprocess_level(app, concurrency, bodies):
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(body):
+        async with gate:
+            start = time.perf_counter()
+            status, payload = await asgi_post(app, "/generate", body)
+            return status, count_cards(status, payload), time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(b) for b in bodies))
+    return summarize(concurrency, results, time.perf_counter() - start)
+
+
+def run_inprocess(args):
+    start = time.perf_counter()
+    import main
+
+    if args.stub:
+        from bench import stubs
+
+        stubs.install(main)
+    main.warmup()
+    if not main.readiness["ready"]:
+        raise RuntimeError(f"warmup failed: {main.readiness['error']}")
+    cold_start = time.perf_counter() - start
+
+    runs = []
+    for concurrency in args.concurrency:
+        bodies = request_bodies(args.requests, args.num_questions)
+        runs.append(asyncio.run(run_inprocess_level(main.app, concurrency, bodies)))
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return cold_start, peak_rss_mb, runs
+
+
+# Server: a real uvicorn process on a free local port
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def http_call(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+    try:
+        payload = json.dumps(body) if body is not None else None
+        conn.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        return resp.status, resp.read()
+    finally:
+        conn.close()
+
+
+def peak_rss_of(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def pss_of(pid):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def run_server_level(port, concurrency, bodies):
+    def one(body):
+        start = time.perf_counter()
+        try:
+            status, payload = http_call(port, "POST", "/generate", body)
+        except OSError:
+            return "connection_error", 0, time.perf_counter() - start
+        return status, count_cards(status, payload), time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, bodies))
+    return summarize(concurrency, results, time.perf_counter() - start)
+
+
+def run_server(args, env):
+    port = free_port()
+    app_ref = "bench.stub_app:app" if args.stub else "main:app"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_ref, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with status {proc.returncode}")
+            if time.perf_counter() - start > args.startup_timeout:
+                raise RuntimeError("server did not become ready in time")
+            try:
+                if http_call(port, "GET", "/ready")[0] == 200:
+                    break
+            except OSError:
+                pass
+            time.sleep(0.05)
+        cold_start = time.perf_counter() - start
+
+        runs = []
+        for concurrency in args.concurrency:
+            bodies = request_bodies(args.requests, args.num_questions)
+            runs.append(run_server_level(port, concurrency, bodies))
+        return cold_start, peak_rss_of(proc.pid), runs
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+# Gunicorn: the production setup, once per PRELOAD_MODELS setting
+def wait_for_first_200(proc, port, start, timeout):
+    body = request_bodies(1, 1)[0]
+    while True:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {proc.returncode}")
+        if time.perf_counter() - start > timeout:
+            raise RuntimeError("gunicorn did not answer POST /generate in time")
+        try:
+            if http_call(port, "POST", "/generate", body)[0] == 200:
+                return time.perf_counter() - start
+        except OSError:
+            pass
+        time.sleep(0.05)
+
+
+def wait_for_workers(proc, port, workers, start, timeout):
+    ready = {}
+    while len(ready) < workers:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {proc.returncode}")
+        if time.perf_counter() - start > timeout:
+            raise RuntimeError(f"only {len(ready)} of {workers} workers became ready: {sorted(ready)}")
+        try:
+            status, payload = http_call(port, "GET", "/ready")
+        except OSError:
+            status = None
+        if status == 200:
+            body = json.loads(payload)
+            ready.setdefault(body["pid"], {
+                "pid": body["pid"],
+                "model_load_seconds": body["model_load_seconds"],
+                "warmup_seconds": body["warmup_seconds"],
+                **body["memory"],
+            })
+        else:
+            time.sleep(0.05)
+    return time.perf_counter() - start, sorted(ready.values(), key=lambda w: w["pid"])
+
+
+def run_gunicorn(args, env, preload):
+    port = free_port()
+    env = dict(env, PRELOAD_MODELS="1" if preload else "0")
+    workers = int(env.setdefault("WEB_CONCURRENCY", "4"))
+    app_ref = "bench.stub_app:app" if args.stub else "main:app"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", app_ref,
+         "--bind", f"127.0.0.1:{port}", "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        first_200 = wait_for_first_200(proc, port, start, args.startup_timeout)
+        all_ready, worker_stats = wait_for_workers(proc, port, workers, start, args.startup_timeout)
+        master_pss_mb = pss_of(proc.pid)
+        pss = [w.get("pss_mb") for w in worker_stats]
+
+        runs = []
+        for concurrency in args.concurrency:
+            bodies = request_bodies(args.requests, args.num_questions)
+            runs.append(run_server_level(port, concurrency, bodies))
+        return {
+            "preload": preload,
+            "workers": workers,
+            "first_200_seconds": first_200,
+            "all_ready_seconds": all_ready,
+            "master_pss_mb": master_pss_mb,
+            "total_pss_mb": sum(pss) + (master_pss_mb or 0) if None not in pss else None,
+            "worker_memory": worker_stats,
+            "runs": runs,
+        }
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_runs(runs, base_runs):
+    for run in runs:
+        line = (f"  concurrency={run['concurrency']:<3} rps={run['throughput_rps']:.2f} "
+                f"p50={run['p50_ms']:.0f}ms p95={run['p95_ms']:.0f}ms p99={run['p99_ms']:.0f}ms "
+                f"statuses={run['statuses']}")
+        base = base_runs.get(run["concurrency"])
+        if base and base["throughput_rps"] and base["p95_ms"]:
+            line += (f"  vs baseline: rps {run['throughput_rps'] / base['throughput_rps'] - 1:+.0%}, "
+                     f"p95 {run['p95_ms'] / base['p95_ms'] - 1:+.0%}")
+        print(line)
+
+
+def print_report(report, baseline=None):
+    if report["mode"] != "gunicorn":
+        base_runs = {r["concurrency"]: r for r in baseline.get("runs", [])} if baseline else {}
+        print(f"mode={report['mode']} stub={report['stub']} cold_start={report['cold_start_seconds']:.2f}s "
+              f"peak_rss={report['peak_rss_mb'] or 0:.0f}MB")
+        print_runs(report["runs"], base_runs)
+        return
+    base_servers = {s["preload"]: s for s in baseline.get("gunicorn", [])} if baseline else {}
+    for server in report["gunicorn"]:
+        print(f"mode=gunicorn stub={report['stub']} preload={server['preload']} workers={server['workers']} "
+              f"first_200={server['first_200_seconds']:.2f}s all_ready={server['all_ready_seconds']:.2f}s "
+              f"master_pss={server['master_pss_mb'] or 0:.0f}MB total_pss={server['total_pss_mb'] or 0:.0f}MB")
+        for worker in server["worker_memory"]:
+            memory = " ".join(f"{k[:-3]}={v:.0f}MB" for k, v in worker.items() if k.endswith("_mb"))
+            print(f"  worker pid={worker['pid']} {memory}")
+        base = base_servers.get(server["preload"])
+        print_runs(server["runs"], {r["concurrency"]: r for r in base["runs"]} if base else {})
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["inprocess", "server", "gunicorn"], default="inprocess")
+    parser.add_argument("--stub", action="store_true", help="use the stub models from bench/stubs.py")
+    parser.add_argument("--cache", action="store_true", help="leave the result cache enabled")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=48, help="requests per concurrency level")
+    parser.add_argument("--num-questions", type=int, default=2)
+    parser.add_argument("--preload", type=int, nargs="+", choices=[0, 1], default=[0, 1],
+                        help="PRELOAD_MODELS settings to compare in gunicorn mode")
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if not args.cache:
+        env["RESULT_CACHE_ENABLED"] = "0"
+    # Admission control should not turn the top concurrency level into 503s
+    env.setdefault("INFERENCE_MAX_QUEUE", str(max(args.concurrency)))
+    results = {}
+    if args.mode == "inprocess":
+        os.environ.update(env)
+        cold_start, peak_rss_mb, runs = run_inprocess(args)
+    elif args.mode == "server":
+        cold_start, peak_rss_mb, runs = run_server(args, env)
+    else:
+        results["gunicorn"] = [run_gunicorn(args, env, bool(preload)) for preload in args.preload]
+    if args.mode != "gunicorn":
+        results.update(cold_start_seconds=cold_start, peak_rss_mb=peak_rss_mb, runs=runs)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "mode": args.mode,
+        "stub": args.stub,
+        "cache": args.cache,
+        "requests_per_level": args.requests,
+        "num_questions": args.num_questions,
+        "config": {k: v for k, v in sorted(env.items()) if k.startswith((
+            "INFERENCE_", "BATCH", "RESULT_CACHE_", "TORCH_", "WEB_CONCURRENCY", "BENCH_STUB_", "ANSWER_MODE"))},
+        **results,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,148 @@
+"""Check an inference backend against the fp32 baseline before enabling it.
+
+Each backend runs in its own subprocess (so memory figures are not mixed
+up) and generates flashcards for the fixed corpus one text at a time. The
+report lists load time, model size, RSS, per-text latency and how far the
+questions and answers drift from the baseline.
+
+    python -m bench.parity --backends torch torch-fast torch-int8 --output parity.json
+
+Each candidate is compared with the first backend. torch-fast changes only
+the tokenizer, so its drift separates tokenizer effects from quantization.
+"""
+import argparse
+import difflib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from bench.corpus import TEXTS
+from bench.load import percentile
+
+
+# memory_usage() falls back to peak RSS where /proc/self/smaps_rollup is missing
+def rss_mb(usage):
+    return usage.get("rss_mb", usage.get("max_rss_mb"))
+
+
+def run_worker(num_questions, rounds):
+    import torch
+
+    import main
+
+    main.BATCHING = False
+    before = main.memory_usage()
+    start = time.perf_counter()
+    pipe = main.get_qa_qg_pipeline()
+    load_seconds = time.perf_counter() - start
+    main.get_nlp()
+    after = main.memory_usage()
+
+    buffer = io.BytesIO()
+    torch.save(pipe.model.state_dict(), buffer)
+
+    main.build_flashcards(TEXTS[0], num_questions)
+    latencies, cards = [], []
+    for _ in range(rounds):
+        cards = []
+        for text in TEXTS:
+            start = time.perf_counter()
+            cards.append(main.build_flashcards(text, num_questions)["flashcards"])
+            latencies.append(time.perf_counter() - start)
+
+    return {
+        "backend": main.INFERENCE_BACKEND,
+        "tokenizer": type(pipe.tokenizer).__name__,
+        "load_seconds": load_seconds,
+        "model_bytes": buffer.getbuffer().nbytes,
+        "rss_mb_before_load": rss_mb(before),
+        "rss_mb_after_load": rss_mb(after),
+        "latency_ms_mean": statistics.mean(latencies) * 1000,
+        "latency_ms_p95": percentile(latencies, 95) * 1000,
+        "cards": cards,
+    }
+
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(None, a.lower(), b.lower()).ratio()
+
+
+def compare(baseline, candidate):
+    pairs = [
+        (b, c)
+        for base_cards, cand_cards in zip(baseline["cards"], candidate["cards"])
+        for b, c in zip(base_cards, cand_cards)
+    ]
+    diffs = [
+        {"baseline": b, "candidate": c}
+        for b, c in pairs
+        if b["question"] != c["question"] or b["answer"] != c["answer"]
+    ]
+    return {
+        "cards": len(pairs),
+        "question_exact_match": sum(b["question"] == c["question"] for b, c in pairs) / len(pairs),
+        "answer_exact_match": sum(b["answer"] == c["answer"] for b, c in pairs) / len(pairs),
+        "question_similarity": statistics.mean(similarity(b["question"], c["question"]) for b, c in pairs),
+        "answer_similarity": statistics.mean(similarity(b["answer"], c["answer"]) for b, c in pairs),
+        "latency_speedup": baseline["latency_ms_mean"] / candidate["latency_ms_mean"],
+        "model_size_ratio": candidate["model_bytes"] / baseline["model_bytes"],
+        "differences": diffs,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-fast", "torch-int8"])
+    parser.add_argument("--num-questions", type=int, default=2)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--output")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        json.dump(run_worker(args.num_questions, args.rounds), sys.stdout)
+        return
+
+    results = {}
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.parity", "--worker",
+             "--num-questions", str(args.num_questions), "--rounds", str(args.rounds)],
+            env={**os.environ, "INFERENCE_BACKEND": backend},
+            capture_output=True, text=True, check=True,
+        )
+        results[backend] = json.loads(proc.stdout)
+
+    baseline = results[args.backends[0]]
+    report = {"baseline": args.backends[0], "backends": {}}
+    for backend, result in results.items():
+        summary = {k: v for k, v in result.items() if k != "cards"}
+        if backend != args.backends[0]:
+            summary["parity"] = compare(baseline, result)
+        report["backends"][backend] = summary
+
+    for backend, summary in report["backends"].items():
+        line = (
+            f"{backend:<12} {summary['tokenizer']:<16} load={summary['load_seconds']:.2f}s "
+            f"model={summary['model_bytes'] / 2**20:.1f}MB rss={summary['rss_mb_after_load'] or 0:.0f}MB "
+            f"mean={summary['latency_ms_mean']:.0f}ms p95={summary['latency_ms_p95']:.0f}ms"
+        )
+        if "parity" in summary:
+            p = summary["parity"]
+            line += (
+                f" q_exact={p['question_exact_match']:.0%} a_exact={p['answer_exact_match']:.0%}"
+                f" q_sim={p['question_similarity']:.3f} a_sim={p['answer_similarity']:.3f}"
+            )
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
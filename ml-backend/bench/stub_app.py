@@ -0,0 +1,6 @@
+# ASGI entry point for serving the app with stub models: uvicorn bench.stub_app:app
+import main
+from bench import stubs
+
+stubs.install(main)
+app = main.app
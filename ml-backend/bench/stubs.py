@@ -0,0 +1,101 @@
+"""Stand-ins for the spaCy and T5 models, for measuring request-path overhead.
+
+They implement only what ``main`` uses, need no weights or network access
+and produce deterministic output. Generation latency can be simulated with
+BENCH_STUB_CALL_MS (per generate call) and BENCH_STUB_PROMPT_MS (per prompt).
+"""
+import os
+import re
+import time
+
+_CHUNK = re.compile(r"\b(?:[A-Z][\w-]*|the [a-z]{4,}|[a-z]{8,})(?: [A-Z][\w-]*)*")
+_SENT = re.compile(r"[^.!?\n]+[.!?]?")
+
+
+class StubToken:
+    def __init__(self, text):
+        self.pos_ = "PRON" if text.lower() in ("it", "they", "this", "these", "he", "she") else "NOUN"
+
+
+class StubSpan:
+    def __init__(self, text):
+        self.text = text
+
+    @property
+    def root(self):
+        return StubToken(self.text.split()[-1])
+
+    @property
+    def noun_chunks(self):
+        return [StubSpan(m.group(0)) for m in _CHUNK.finditer(self.text)]
+
+
+class StubDoc(StubSpan):
+    @property
+    def sents(self):
+        return [StubSpan(m.group(0)) for m in _SENT.finditer(self.text) if m.group(0).strip()]
+
+
+class StubNLP:
+    pipe_names = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
+
+    def __call__(self, text, disable=None):
+        return StubDoc(text)
+
+    def pipe(self, texts, disable=None, **kwargs):
+        return (StubDoc(t) for t in texts)
+
+
+class StubTokenizer:
+    """Word-level vocabulary grown on demand; id 0 is padding."""
+
+    pad_token_id = 0
+
+    def __init__(self):
+        self.words = ["<pad>"]
+        self.ids = {"<pad>": 0}
+
+    def encode(self, text):
+        ids = [0]
+        for word in text.split():
+            if word not in self.ids:
+                self.ids[word] = len(self.words)
+                self.words.append(word)
+            ids.append(self.ids[word])
+        return ids
+
+    def batch_decode(self, sequences, skip_special_tokens=True, **kwargs):
+        return [" ".join(self.words[i] for i in seq if i != self.pad_token_id) for seq in sequences]
+
+
+class StubPipeline:
+    model = None
+
+    def __init__(self):
+        self.tokenizer = StubTokenizer()
+        self.call_seconds = float(os.getenv("BENCH_STUB_CALL_MS", "0")) / 1000.0
+        self.prompt_seconds = float(os.getenv("BENCH_STUB_PROMPT_MS", "0")) / 1000.0
+
+    def _generate(self, prompt):
+        if prompt.startswith("generate question:"):
+            answer = prompt.split("<hl>")[1].strip()
+            return f"What is {answer}?"
+        chunks = _CHUNK.findall(prompt.split("context:", 1)[1])
+        return chunks[0] if chunks else ""
+
+    def __call__(self, prompts, **kwargs):
+        prompts = [prompts] if isinstance(prompts, str) else prompts
+        delay = self.call_seconds + self.prompt_seconds * len(prompts)
+        if delay:
+            time.sleep(delay)
+        texts = [self._generate(p) for p in prompts]
+        if kwargs.get("return_tensors"):
+            return [{"generated_token_ids": self.tokenizer.encode(t)} for t in texts]
+        return [{"generated_text": t} for t in texts]
+
+
+def install(main):
+    """Point ``main`` at the stub models."""
+    nlp, pipe = StubNLP(), StubPipeline()
+    main.get_nlp = lambda: nlp
+    main.get_qa_qg_pipeline = lambda backend=None: pipe
@@ -0,0 +1,110 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+# Collapse whitespace so trivially different pastes share an entry
+def normalize_text(text):
+    return " ".join(text.split())
+
+
+def make_key(text, num_questions, model_id):
+    raw = f"{model_id}\x00{num_questions}\x00{normalize_text(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Bounded LRU + TTL cache with single-flight computation per key.
+
+    Concurrent callers asking for a key that is already being computed wait
+    for that computation instead of starting their own. Failures are handed
+    to every waiter but never cached.
+
+    ``claim`` splits a lookup into its three outcomes so async callers can
+    wait on an in-flight result (``asyncio.wrap_future``) without holding a
+    thread, and only the leader has to go and compute.
+    """
+
+    def __init__(self, max_entries=256, ttl_seconds=600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def claim(self, key):
+        """Return ``(value, future, leader)``.
+
+        On a hit ``future`` is None and ``value`` is the cached result.
+        Otherwise ``future`` resolves with the result; if ``leader`` is true
+        the caller must produce it with ``compute`` (or give up with ``fail``).
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[1], None, False
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return None, future, False
+            future = self._in_flight[key] = Future()
+            self.misses += 1
+            return None, future, True
+
+    def compute(self, key, compute):
+        """Run ``compute`` for a key claimed as leader and resolve its waiters."""
+        try:
+            value = compute()
+        except BaseException as exc:
+            self.fail(key, exc)
+            raise
+        with self._lock:
+            future = self._in_flight.pop(key)
+            if self.max_entries > 0:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def fail(self, key, exc):
+        with self._lock:
+            future = self._in_flight.pop(key)
+        future.set_exception(exc)
+
+    def get_or_compute(self, key, compute):
+        value, future, leader = self.claim(key)
+        if future is None:
+            return value
+        if not leader:
+            return future.result()
+        return self.compute(key, compute)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1,170 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_DONE = object()
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Server is busy, retry later")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """Bounded thread pool for inference work in one worker.
+
+    At most ``concurrency`` jobs run at once and at most ``max_queue`` more
+    wait behind them. Anything beyond that is rejected immediately with
+    :class:`Overloaded` rather than queued, so latency degrades gracefully
+    under load. Time spent waiting for a thread is tracked separately from
+    time spent running.
+    """
+
+    def __init__(self, concurrency=2, max_queue=16, retry_after=1, observe=None):
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self.observe = observe
+        self._pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_seconds = 0.0
+        self.compute_seconds = 0.0
+
+    # Reserve a slot or raise Overloaded; every successful call needs a release()
+    def acquire(self):
+        with self._lock:
+            if self.in_flight >= self.concurrency + self.max_queue:
+                self.rejected += 1
+                raise Overloaded(self.retry_after)
+            self.in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _record(self, queue_seconds, compute_seconds):
+        with self._lock:
+            self.completed += 1
+            self.queue_seconds += queue_seconds
+            self.compute_seconds += compute_seconds
+        if self.observe is not None:
+            self.observe(queue_seconds, compute_seconds)
+
+    async def run(self, fn, *args):
+        """Run ``fn(*args)`` on the pool, returning ``(result, timing)``."""
+        self.acquire()
+        timing = {}
+        submitted = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timing["queue"] = started - submitted
+                timing["compute"] = time.perf_counter() - started
+                self._record(timing["queue"], timing["compute"])
+
+        try:
+            future = self._pool.submit(call)
+        except BaseException:
+            self.release()
+            raise
+        # Release when the work ends, even if the awaiting request was cancelled
+        future.add_done_callback(lambda _: self.release())
+        return await asyncio.wrap_future(future), timing
+
+    async def iterate(self, iterator):
+        """Drive a sync iterator on the pool. The caller must hold a slot from acquire().
+
+        Recorded like one ``run`` when the stream ends: queue is the wait for
+        the first step to get a thread, compute the sum of all steps.
+        """
+        timing = {"queue": None, "compute": 0.0}
+        submitted = time.perf_counter()
+
+        def step():
+            started = time.perf_counter()
+            if timing["queue"] is None:
+                timing["queue"] = started - submitted
+            try:
+                return next(iterator, _DONE)
+            finally:
+                timing["compute"] += time.perf_counter() - started
+
+        try:
+            while True:
+                item = await asyncio.wrap_future(self._pool.submit(step))
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            if timing["queue"] is not None:
+                self._record(timing["queue"], timing["compute"])
+            self.release()
+
+    def stream(self, iterator, **kwargs):
+        """Admit a streamed response for ``iterator``, or raise Overloaded.
+
+        Admission happens here, before the response starts, so an overloaded
+        worker can still answer 503. The slot is held until the stream ends.
+        """
+        self.acquire()
+        return AdmittedStreamingResponse(self, iterator, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_queue_ms": self.queue_seconds / self.completed * 1000 if self.completed else 0.0,
+                "avg_compute_ms": self.compute_seconds / self.completed * 1000 if self.completed else 0.0,
+            }
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """StreamingResponse driven by ``executor.iterate`` under an acquired slot.
+
+    ``iterate`` releases the slot when it finishes, but its ``finally`` never
+    runs if it was never started, e.g. when the client disconnected before
+    the headers were sent. The response releases the slot itself in that case.
+    """
+
+    def __init__(self, executor, iterator, **kwargs):
+        self.executor = executor
+        self.started = False
+        super().__init__(self._iterate(iterator), **kwargs)
+
+    async def _iterate(self, iterator):
+        self.started = True
+        async for item in self.executor.iterate(iterator):
+            yield item
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if not self.started:
+                self.executor.release()
+
+
+def overloaded_response(exc):
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def server_timing(timing):
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timing.items())
@@ -0,0 +1,34 @@
+import gc
+import os
+import tempfile
+
+# Exported so main.py sizes torch's thread pools for the same number of workers
+workers = int(os.environ.setdefault("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Workers write metric snapshots here so /metrics can report all of them
+os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp(prefix="flashcards-metrics-"))
+
+# PRELOAD_MODELS=1 imports the app, and with it the models, once in the master
+# before forking. Off until `python -m bench.load --mode gunicorn --preload 0 1`
+# has been run with the real models (and INFERENCE_BACKEND=torch-int8) to
+# confirm torch works in forked workers and that PSS and time to first request
+# actually drop.
+preload_app = os.getenv("PRELOAD_MODELS", "0") == "1"
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    import main
+
+    main.load_models()
+    server.log.info("Models loaded in master in %.2fs", main.readiness["model_load_seconds"])
+    # Keep the collector from touching (and so copying) inherited objects in workers
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    from metrics import mark_process_dead
+
+    mark_process_dead(os.environ["METRICS_DIR"], worker.pid)
@@ -1,12 +1,124 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field
-from transformers import pipeline, AutoModelForSeq2SeqLM, T5Tokenizer
+from transformers import pipeline, AutoModelForSeq2SeqLM, AutoTokenizer, T5Tokenizer
 import spacy
+import torch
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+import json
 from functools import lru_cache
+from cache import ResultCache, make_key, normalize_text
+from answers import align_answer, select_answers
+from batching import BatchScheduler
+from executor import InferenceExecutor, Overloaded, overloaded_response, server_timing
+from metrics import Registry
 
-app = FastAPI()
+MODEL_NAME = "valhalla/t5-small-qa-qg-hl"
+
+# Inference backends; "torch" is the original fp32 model with the sentencepiece
+# tokenizer, "torch-fast" swaps only the tokenizer so parity drift can be told
+# apart from that of int8 quantization
+BACKENDS = {
+    "torch": {"quantize": False, "fast_tokenizer": False},
+    "torch-fast": {"quantize": False, "fast_tokenizer": True},
+    "torch-int8": {"quantize": True, "fast_tokenizer": True},
+}
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+if INFERENCE_BACKEND not in BACKENDS:
+    raise ValueError(f"INFERENCE_BACKEND must be one of {sorted(BACKENDS)}, got {INFERENCE_BACKEND!r}")
+MODEL_ID = f"{MODEL_NAME}:{INFERENCE_BACKEND}"
+
+# "qa" decodes every answer with T5; "fast" uses the highlighted span when it
+# aligns with the context and only falls back to the QA decode when it doesn't
+ANSWER_MODE = os.getenv("ANSWER_MODE", "qa")
+if ANSWER_MODE not in ("qa", "fast"):
+    raise ValueError(f"ANSWER_MODE must be 'qa' or 'fast', got {ANSWER_MODE!r}")
+
+BATCHING = os.getenv("INFERENCE_BATCHING", "1") == "1"
+
+# Requests admitted to run at once in this worker. With batching on, admitted
+# requests only wait on the two scheduler threads that call torch, so the limit
+# has to be high enough to keep their batches full; with it off, every admitted
+# request calls torch itself.
+INFERENCE_CONCURRENCY = int(os.getenv("INFERENCE_CONCURRENCY", "16" if BATCHING else "2"))
+
+# Threads that call torch at the same time in one worker
+TORCH_CALLERS = 2 if BATCHING else INFERENCE_CONCURRENCY
+
+# Split the cores between every concurrent torch caller on the host instead of
+# letting each one spin up a thread per core. gunicorn.conf.py exports its
+# WEB_CONCURRENCY default, so the worker count here matches what it forked;
+# the fallback of 1 is the single-process start.sh case.
+def configure_torch_threads():
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    budget = (os.cpu_count() or 1) // (workers * TORCH_CALLERS)
+    intra = int(os.getenv("TORCH_INTRA_OP_THREADS", max(1, budget)))
+    inter = int(os.getenv("TORCH_INTER_OP_THREADS", "1"))
+    torch.set_num_threads(intra)
+    try:
+        torch.set_num_interop_threads(inter)
+    except RuntimeError:
+        # Can only be set before the first inter-op parallel work in this process
+        pass
+
+configure_torch_threads()
+
+# Hot-path instrumentation, exposed in Prometheus text format at /metrics
+metrics = Registry(directory=os.getenv("METRICS_DIR"))
+STAGE_SECONDS = metrics.histogram(
+    "flashcards_stage_seconds", "Time spent in each stage of flashcard generation", ["stage"])
+GENERATION_BATCH_SIZE = metrics.histogram(
+    "flashcards_generation_batch_size", "Prompts per T5 generate call", buckets=(1, 2, 4, 8, 16, 32, 64))
+GENERATED_TOKENS = metrics.counter(
+    "flashcards_generated_tokens_total", "Tokens produced by T5 generation")
+TOKENS_PER_SECOND = metrics.histogram(
+    "flashcards_generation_tokens_per_second", "Generated tokens per second of each generate call",
+    buckets=(10, 25, 50, 100, 250, 500, 1000, 2500, 5000))
+INPUT_CHARS = metrics.histogram(
+    "flashcards_input_chars", "Length of submitted text", ["endpoint"],
+    buckets=(50, 100, 250, 500, 1000, 5000, 20000, 50000, 200000))
+ERRORS = metrics.counter(
+    "flashcards_errors_total", "Failures by exception type", ["type"])
+ANSWER_SOURCE = metrics.counter(
+    "flashcards_answer_source_total", "Where card answers came from: span, qa_fallback or qa", ["source"])
+
+# queue_wait is the wait for an executor thread. With batching on, the wait
+# for the torch threads happens inside compute and is reported per prompt as
+# batch_wait.
+def observe_inference(queue_seconds, compute_seconds):
+    STAGE_SECONDS.observe(queue_seconds, stage="queue_wait")
+    STAGE_SECONDS.observe(compute_seconds, stage="compute")
+
+def observe_batch_wait(seconds):
+    STAGE_SECONDS.observe(seconds, stage="batch_wait")
+
+# Per-worker admission control: requests beyond concurrency + queue get a fast 503
+inference = InferenceExecutor(
+    concurrency=INFERENCE_CONCURRENCY,
+    max_queue=int(os.getenv("INFERENCE_MAX_QUEUE", "16")),
+    retry_after=int(os.getenv("RETRY_AFTER_SECONDS", "1")),
+    observe=observe_inference,
+)
+
+PROCESS_STARTED = time.monotonic()
+
+# Readiness of this worker; /ready stays 503 until warmup has finished
+readiness = {"ready": False, "model_load_seconds": None, "warmup_seconds": None, "error": None}
+_load_lock = threading.Lock()
+
+@asynccontextmanager
+async def lifespan(app):
+    threading.Thread(target=warmup, name="warmup", daemon=True).start()
+    metrics.start_flushing(float(os.getenv("METRICS_FLUSH_SECONDS", "5")))
+    yield
+    metrics.flush()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,9 +133,23 @@ class InputText(BaseModel):
     text: str = Field(..., min_length=10, max_length=500)
     num_questions: int = Field(default=1, ge=1, le=2)
 
+class StreamInput(BaseModel):
+    text: str = Field(..., min_length=10, max_length=200_000)
+    max_cards: int = Field(default=20, ge=1, le=100)
+    cards_per_window: int = Field(default=2, ge=1, le=2)
+
+class BatchInput(BaseModel):
+    texts: list[str] = Field(..., min_length=1, max_length=64)
+    num_questions: int = Field(default=1, ge=1, le=2)
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return overloaded_response(exc)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
+    ERRORS.inc(type=type(exc).__name__)
     return JSONResponse(status_code=500, content={"error": str(exc)})
 
 # Lazy-load and cache the spaCy model
@@ -31,53 +157,405 @@ async def global_exception_handler(request: Request, exc: Exception):
 def get_nlp():
     return spacy.load("en_core_web_sm")
 
-# Lazy-load and cache the transformers pipeline
+# Lazy-load and cache the transformers pipeline for the configured backend
+def get_qa_qg_pipeline(backend=None):
+    return load_pipeline(backend or INFERENCE_BACKEND)
+
 @lru_cache()
-def get_qa_qg_pipeline():
-    model_name = "valhalla/t5-small-qa-qg-hl"
-    tokenizer = T5Tokenizer.from_pretrained(model_name)
-    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+def load_pipeline(backend):
+    options = BACKENDS[backend]
+    if options["fast_tokenizer"]:
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, use_fast=True)
+    else:
+        tokenizer = T5Tokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME).eval()
+    if options["quantize"]:
+        # Dynamic int8: Linear weights stored quantized, activations quantized per batch
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
     return pipeline("text2text-generation", model=model, tokenizer=tokenizer)
 
+# Load both models; under gunicorn's preload_app this runs once in the master
+# so forked workers share the weights copy-on-write
+def load_models():
+    with _load_lock:
+        if readiness["model_load_seconds"] is None:
+            start = time.perf_counter()
+            get_nlp()
+            get_qa_qg_pipeline()
+            # Reported by the flashcards_model_load_seconds gauge, not the stage
+            # histogram: under preload this runs in the master, and every forked
+            # worker would report the same observation again
+            readiness["model_load_seconds"] = time.perf_counter() - start
+
+WARMUP_TEXT = "The mitochondria is the powerhouse of the cell."
+
+# Runs once per worker, after any fork, so torch thread pools are created in the worker
+def warmup():
+    try:
+        load_models()
+        start = time.perf_counter()
+        build_flashcards(WARMUP_TEXT, 1)
+        readiness["warmup_seconds"] = time.perf_counter() - start
+        STAGE_SECONDS.observe(readiness["warmup_seconds"], stage="warmup")
+        readiness["ready"] = True
+    except Exception as exc:
+        ERRORS.inc(type=type(exc).__name__)
+        readiness["error"] = str(exc)
+
+# Resident and proportional set size of this process, in MB
+def memory_usage():
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in ("Rss", "Pss", "Shared_Clean", "Private_Dirty"):
+                    usage[name.lower() + "_mb"] = int(rest.split()[0]) / 1024
+    except OSError:
+        import resource
+        usage["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return usage
+
+def question_prompt(answer, context):
+    return f"generate question: <hl> {answer} <hl> {context}"
+
+def answer_prompt(question, context):
+    return f"question: {question} context: {context}"
+
+# Run a list of prompts through the pipeline as one padded batch
+def run_generation(prompts, pipe=None):
+    pipe = pipe or get_qa_qg_pipeline()
+    start = time.perf_counter()
+    # Ask for token ids so they can be counted, then decode exactly as the pipeline would
+    outputs = pipe(prompts, max_length=64, do_sample=False, batch_size=len(prompts), return_tensors=True)
+    elapsed = time.perf_counter() - start
+    ids = [(out[0] if isinstance(out, list) else out)["generated_token_ids"] for out in outputs]
+    ids = [seq.tolist() if hasattr(seq, "tolist") else list(seq) for seq in ids]
+    texts = pipe.tokenizer.batch_decode(ids, skip_special_tokens=True, clean_up_tokenization_spaces=False)
+    texts = [t.strip() for t in texts]
+
+    # Padding (which is also T5's decoder start token) was not generated
+    tokens = sum(1 for seq in ids for t in seq if t != pipe.tokenizer.pad_token_id)
+    GENERATION_BATCH_SIZE.observe(len(prompts))
+    GENERATED_TOKENS.inc(tokens)
+    if elapsed > 0:
+        TOKENS_PER_SECOND.observe(tokens / elapsed)
+    return texts
+
+# Question and answer prompts from all in-flight requests are batched separately
+question_batcher = BatchScheduler(
+    run_generation,
+    max_batch_size=int(os.getenv("BATCH_MAX_SIZE", "8")),
+    max_wait_ms=float(os.getenv("BATCH_MAX_WAIT_MS", "5")),
+    name="question",
+    observe=observe_batch_wait,
+)
+answer_batcher = BatchScheduler(
+    run_generation,
+    max_batch_size=int(os.getenv("BATCH_MAX_SIZE", "8")),
+    max_wait_ms=float(os.getenv("BATCH_MAX_WAIT_MS", "5")),
+    name="answer",
+    observe=observe_batch_wait,
+)
+
+def generate_texts(batcher, prompts):
+    if not BATCHING:
+        return [run_generation([p])[0] for p in prompts]
+    return batcher.map(prompts)
+
+# Like generate_texts, but a failed prompt yields its exception instead of
+# raising. Failures are retried alone so one bad prompt does not sink its batch;
+# the retry goes back through the batcher so only its threads call torch.
+def generate_each(batcher, prompts):
+    futures = [batcher.submit(p) for p in prompts] if BATCHING else None
+    outputs = []
+    for i, prompt in enumerate(prompts):
+        try:
+            outputs.append(futures[i].result() if futures else run_generation([prompt])[0])
+            continue
+        except Exception as exc:
+            outputs.append(exc)
+        if futures:
+            try:
+                outputs[-1] = batcher.submit(prompt).result()
+            except Exception as exc:
+                outputs[-1] = exc
+        if isinstance(outputs[-1], Exception):
+            ERRORS.inc(type=type(outputs[-1]).__name__)
+    return outputs
+
+# Identical requests (debounced preview, then Generate) share one computation.
+# RESULT_CACHE_ENABLED=0 bypasses it entirely, coalescing included, so that
+# benchmarks compute every request.
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") == "1"
+result_cache = ResultCache(
+    max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256")),
+    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "600")),
+)
+
+# noun_chunks and sents only need the tagger and parser; skip NER, lemmatizer etc.
+NOUN_CHUNK_PIPES = ("tok2vec", "tagger", "attribute_ruler", "parser")
+
+def noun_chunk_disable(nlp):
+    return [name for name in nlp.pipe_names if name not in NOUN_CHUNK_PIPES]
+
 # Extract top N short noun phrases
 def extract_answers(text, max_answers=2):
     nlp = get_nlp()
-    seen, answers = set(), []
-    for chunk in nlp(text).noun_chunks:
-        c = chunk.text.strip()
-        if c.lower() not in seen and 1 <= len(c.split()) <= 5:
-            seen.add(c.lower())
-            answers.append(c)
-        if len(answers) >= max_answers:
-            break
-    return answers or ["this topic"]
+    with STAGE_SECONDS.time(stage="extract_answers"):
+        doc = nlp(text, disable=noun_chunk_disable(nlp))
+        return select_answers(doc.noun_chunks, max_answers) or ["this topic"]
+
+# One answer per (answer span, question, context) job, or None where the QA decode is still needed
+def fast_answers(jobs):
+    if ANSWER_MODE != "fast":
+        return [None] * len(jobs)
+    aligned = [align_answer(ans, q, context) for ans, q, context in jobs]
+    hits = sum(a is not None for a in aligned)
+    ANSWER_SOURCE.inc(hits, source="span")
+    ANSWER_SOURCE.inc(len(aligned) - hits, source="qa_fallback")
+    return aligned
 
 @app.post("/generate")
-def generate_flashcards(input: InputText):
-    text = input.text.strip()
+async def generate_flashcards(input: InputText, response: Response):
+    text = normalize_text(input.text)
     num = input.num_questions
+    INPUT_CHARS.observe(len(text), endpoint="generate")
     if not text:
         return {"flashcards": []}
 
-    pipe = get_qa_qg_pipeline()
-    answers = extract_answers(text, max_answers=num)
-    cards = []
+    if not RESULT_CACHE_ENABLED:
+        result, timing = await inference.run(build_flashcards, text, num)
+        response.headers["Server-Timing"] = server_timing(timing)
+        return result
+
+    # Hits and requests joining an identical in-flight computation skip admission;
+    # only the leader takes an executor slot
+    key = make_key(text, num, f"{MODEL_ID}:{ANSWER_MODE}")
+    cached, flight, leader = result_cache.claim(key)
+    if flight is None:
+        return cached
+    if not leader:
+        return await asyncio.wrap_future(flight)
+
+    try:
+        result, timing = await inference.run(result_cache.compute, key, lambda: build_flashcards(text, num))
+    except Overloaded as exc:
+        # Nothing was submitted, so hand the rejection to the waiters too
+        result_cache.fail(key, exc)
+        raise
+    response.headers["Server-Timing"] = server_timing(timing)
+    return result
 
-    for ans in answers:
-        q_in = f"generate question: <hl> {ans} <hl> {text}"
-        q_out = pipe(q_in, max_length=64, do_sample=False)[0]["generated_text"].strip()
-        if not q_out.endswith("?"):
-            q_out += "?"
+def build_flashcards(text, num):
+    return {"flashcards": cards_for_answers(text, extract_answers(text, max_answers=num))}
 
-        qa_in = f"question: {q_out} context: {text}"
-        a_out = pipe(qa_in, max_length=64, do_sample=False)[0]["generated_text"].strip()
+def cards_for_answers(text, answers):
+    with STAGE_SECONDS.time(stage="question_generation"):
+        questions = generate_texts(question_batcher, [question_prompt(ans, text) for ans in answers])
+    questions = [q if q.endswith("?") else q + "?" for q in questions]
 
+    replies = fast_answers([(ans, q, text) for ans, q in zip(answers, questions)])
+    pending = [i for i, a in enumerate(replies) if a is None]
+    with STAGE_SECONDS.time(stage="answer_generation"):
+        decoded = generate_texts(answer_batcher, [answer_prompt(questions[i], text) for i in pending])
+    for i, a_out in zip(pending, decoded):
+        replies[i] = a_out
+    if ANSWER_MODE == "qa":
+        ANSWER_SOURCE.inc(len(decoded), source="qa")
+
+    cards = []
+    for ans, q_out, a_out in zip(answers, questions, replies):
         cards.append({
             "question": q_out,
             "answer": a_out or ans
         })
 
-    return {"flashcards": cards}
+    return cards
+
+# Flashcards for many texts at once: one nlp.pipe pass, then every question
+# prompt, then every answer prompt, through batched generation
+def bulk_flashcards(texts, num):
+    texts = [normalize_text(t) for t in texts]
+    results = [None] * len(texts)
+    valid = []
+    for i, text in enumerate(texts):
+        if 10 <= len(text) <= 500:
+            valid.append(i)
+        else:
+            results[i] = {"error": "text must be between 10 and 500 characters"}
+
+    nlp = get_nlp()
+    answers = {}
+    with STAGE_SECONDS.time(stage="extract_answers"):
+        docs = nlp.pipe((texts[i] for i in valid), disable=noun_chunk_disable(nlp))
+        for i, doc in zip(valid, docs):
+            answers[i] = select_answers(doc.noun_chunks, num) or ["this topic"]
+
+    jobs = [(i, ans) for i in valid for ans in answers[i]]
+    with STAGE_SECONDS.time(stage="question_generation"):
+        questions = generate_each(question_batcher, [question_prompt(ans, texts[i]) for i, ans in jobs])
+    for (i, _), q_out in zip(jobs, questions):
+        if isinstance(q_out, Exception):
+            results[i] = {"error": str(q_out)}
+
+    jobs = [(job, q if q.endswith("?") else q + "?") for job, q in zip(jobs, questions) if results[job[0]] is None]
+    replies = fast_answers([(ans, q_out, texts[i]) for (i, ans), q_out in jobs])
+    pending = [k for k, a in enumerate(replies) if a is None]
+    with STAGE_SECONDS.time(stage="answer_generation"):
+        decoded = generate_each(answer_batcher, [answer_prompt(jobs[k][1], texts[jobs[k][0][0]]) for k in pending])
+    for k, a_out in zip(pending, decoded):
+        replies[k] = a_out
+    if ANSWER_MODE == "qa":
+        ANSWER_SOURCE.inc(len(decoded), source="qa")
+    for ((i, ans), q_out), a_out in zip(jobs, replies):
+        if results[i] is None:
+            results[i] = {"flashcards": []}
+        if "error" in results[i]:
+            continue
+        if isinstance(a_out, Exception):
+            results[i] = {"error": str(a_out)}
+            continue
+        results[i]["flashcards"].append({
+            "question": q_out,
+            "answer": a_out or ans
+        })
+
+    return {"results": results}
+
+# Long documents are parsed a block at a time and generated a window at a time,
+# so memory depends on these sizes rather than on the document length
+STREAM_BLOCK_CHARS = int(os.getenv("STREAM_BLOCK_CHARS", "5000"))
+STREAM_WINDOW_CHARS = int(os.getenv("STREAM_WINDOW_CHARS", "500"))
+
+# Slice text into blocks of at most `size` chars, cut at a line or sentence end where possible
+def iter_blocks(text, size):
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            cut = max(text.rfind("\n", start, end), text.rfind(". ", start, end))
+            if cut > start:
+                end = cut + 1
+        yield text[start:end]
+        start = end
+
+# Group consecutive sentences into windows of at most `size` chars
+def iter_windows(text, size):
+    nlp = get_nlp()
+    for block in iter_blocks(text, STREAM_BLOCK_CHARS):
+        window = []
+        length = 0
+        with STAGE_SECONDS.time(stage="extract_answers"):
+            doc = nlp(block, disable=noun_chunk_disable(nlp))
+        for sent in doc.sents:
+            sent_len = len(sent.text)
+            if window and length + sent_len > size:
+                yield window
+                window, length = [], 0
+            window.append(sent)
+            length += sent_len + 1
+        if window:
+            yield window
+
+def stream_flashcards(text, max_cards, cards_per_window):
+    seen = set()
+    sent = 0
+    for index, window in enumerate(iter_windows(text, STREAM_WINDOW_CHARS)):
+        # A single overlong sentence still has to fit the model's input; answers
+        # cut off by that can't be highlighted, so they are skipped
+        context = normalize_text(" ".join(s.text for s in window))[:STREAM_WINDOW_CHARS * 2]
+        chunks = (chunk for s in window for chunk in s.noun_chunks if normalize_text(chunk.text) in context)
+        answers = select_answers(chunks, min(cards_per_window, max_cards - sent), seen)
+        if not answers:
+            continue
+        with STAGE_SECONDS.time(stage="stream_window"):
+            cards = cards_for_answers(context, answers)
+        for card in cards:
+            yield {"window": index, **card}
+            sent += 1
+        if sent >= max_cards:
+            break
+
+def format_events(events, sse):
+    try:
+        for event in events:
+            line = json.dumps(event)
+            yield f"data: {line}\n\n" if sse else line + "\n"
+        done = json.dumps({"done": True})
+    except Exception as exc:
+        ERRORS.inc(type=type(exc).__name__)
+        done = json.dumps({"error": str(exc)})
+    yield f"data: {done}\n\n" if sse else done + "\n"
+
+# Deck import: results come back in input order, with a per-item error where an item failed
+@app.post("/generate/batch")
+async def generate_flashcards_batch(input: BatchInput, response: Response):
+    for text in input.texts:
+        INPUT_CHARS.observe(len(text), endpoint="batch")
+    result, timing = await inference.run(bulk_flashcards, input.texts, input.num_questions)
+    response.headers["Server-Timing"] = server_timing(timing)
+    return result
+
+# Stream cards for a long document as NDJSON, or as SSE when the client asks for text/event-stream
+@app.post("/generate/stream")
+async def generate_flashcards_stream(input: StreamInput, request: Request):
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    INPUT_CHARS.observe(len(input.text), endpoint="stream")
+    events = stream_flashcards(input.text, input.max_cards, input.cards_per_window)
+    return inference.stream(
+        format_events(events, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+    )
+
+@app.get("/stats")
+def stats():
+    return {
+        "backend": INFERENCE_BACKEND,
+        "answers": {
+            "mode": ANSWER_MODE,
+            "span": ANSWER_SOURCE.get(source="span"),
+            "qa_fallback": ANSWER_SOURCE.get(source="qa_fallback"),
+            "qa": ANSWER_SOURCE.get(source="qa"),
+        },
+        "cache": {"enabled": RESULT_CACHE_ENABLED, **result_cache.stats()},
+        "inference": inference.stats(),
+        "batching": {
+            "enabled": BATCHING,
+            "question": question_batcher.stats(),
+            "answer": answer_batcher.stats(),
+        },
+    }
+
+# Values kept by other components are read at scrape time
+metrics.gauge("flashcards_cache_events_total", "Result cache lookups by outcome",
+              lambda: {(k,): result_cache.stats()[k] for k in ("hits", "misses", "coalesced")},
+              ["outcome"], kind="counter")
+metrics.gauge("flashcards_rejected_total", "Requests rejected by admission control",
+              lambda: inference.rejected, kind="counter")
+metrics.gauge("flashcards_inference_in_flight", "Admitted requests running or queued",
+              lambda: inference.in_flight)
+metrics.gauge("flashcards_model_load_seconds", "Time taken to load spaCy and T5",
+              lambda: readiness["model_load_seconds"], aggregate="max")
+metrics.gauge("flashcards_warmup_seconds", "Slowest worker warmup generation",
+              lambda: readiness["warmup_seconds"], aggregate="max")
+metrics.gauge("flashcards_ready", "Workers that have finished warmup",
+              lambda: int(readiness["ready"]))
+
+@app.get("/metrics")
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready")
+def ready():
+    body = {
+        "status": "ready" if readiness["ready"] else "warming",
+        "pid": os.getpid(),
+        "seconds_since_start": time.monotonic() - PROCESS_STARTED,
+        **readiness,
+        "memory": memory_usage(),
+    }
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=body)
 
 # Health check routes
 @app.get("/health")
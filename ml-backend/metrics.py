@@ -0,0 +1,247 @@
+"""Minimal Prometheus-style metrics with text exposition.
+
+Recording is a dict lookup, a bisect and a few additions under a lock,
+which is cheap enough to leave on in production.
+
+Under gunicorn every worker has its own values. When the registry has a
+directory (METRICS_DIR, created by gunicorn.conf.py), each worker writes a
+snapshot of its values there every few seconds and whenever it serves a
+scrape. /metrics merges all snapshots, so any worker reports the totals:
+counters and histograms are summed, including workers that have exited so
+totals never go backwards, and gauges are combined over live workers only.
+"""
+import bisect
+import glob
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def collect(self):
+        with self._lock:
+            return list(self._values.items())
+
+    def samples(self, values):
+        return [(self.name, _labels(self.labelnames, key), value) for key, value in values.items()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self):
+        with self._lock:
+            return [(key, [list(state[0]), state[1], state[2]]) for key, state in self._values.items()]
+
+    def samples(self, values):
+        out = []
+        for key, (counts, total, count) in values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                out.append((f"{self.name}_bucket", _labels(self.labelnames, key, [("le", _number(bound))]), cumulative))
+            out.append((f"{self.name}_sum", _labels(self.labelnames, key), total))
+            out.append((f"{self.name}_count", _labels(self.labelnames, key), count))
+        return out
+
+
+class Gauge:
+    """Value read from a callback at snapshot time.
+
+    The callback returns a number, or a dict mapping label-value tuples to
+    numbers. ``None`` values are skipped. ``kind="counter"`` exposes a count
+    kept elsewhere as a counter; otherwise values from live workers are
+    combined with ``aggregate`` ("sum" or "max").
+    """
+
+    def __init__(self, name, documentation, read, labelnames=(), kind="gauge", aggregate="sum"):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        self.aggregate = aggregate
+
+    def collect(self):
+        value = self.read()
+        values = value if isinstance(value, dict) else {(): value}
+        return [(tuple(key), v) for key, v in values.items() if v is not None]
+
+    def samples(self, values):
+        return [(self.name, _labels(self.labelnames, key), v) for key, v in values.items()]
+
+
+def _merge(metric, sources):
+    merged = {}
+    for snapshot, alive in sources:
+        for key, value in snapshot.get(metric.name, []):
+            key = tuple(key)
+            current = merged.get(key)
+            if metric.kind == "histogram":
+                if current is None:
+                    merged[key] = [list(value[0]), value[1], value[2]]
+                else:
+                    current[0] = [a + b for a, b in zip(current[0], value[0])]
+                    current[1] += value[1]
+                    current[2] += value[2]
+            elif metric.kind == "counter":
+                merged[key] = (current or 0) + value
+            elif alive:
+                if current is None:
+                    merged[key] = value
+                elif metric.aggregate == "max":
+                    merged[key] = max(current, value)
+                else:
+                    merged[key] = current + value
+    return merged
+
+
+def mark_process_dead(directory, pid):
+    """Keep an exited worker's counters but drop its gauges (gunicorn child_exit hook)."""
+    for path in glob.glob(os.path.join(directory, f"worker-{pid}-*.json")):
+        os.replace(path, os.path.join(directory, "dead-" + os.path.basename(path)[len("worker-"):]))
+
+
+class Registry:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._metrics = []
+        self._path = None
+        self._path_pid = None
+        self._flusher = None
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs):
+        return self.register(Counter(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs):
+        return self.register(Histogram(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs):
+        return self.register(Gauge(*args, **kwargs))
+
+    def snapshot(self):
+        return {m.name: [[list(key), value] for key, value in m.collect()] for m in self._metrics}
+
+    # One file per process; a forked worker gets its own even with a reused pid
+    def _snapshot_path(self):
+        if self._path_pid != os.getpid():
+            self._path_pid = os.getpid()
+            self._path = os.path.join(self.directory, f"worker-{self._path_pid}-{os.urandom(4).hex()}.json")
+        return self._path
+
+    def flush(self, snapshot=None):
+        if not self.directory:
+            return
+        path = self._snapshot_path()
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot() if snapshot is None else snapshot, f)
+        os.replace(tmp, path)
+
+    def start_flushing(self, interval):
+        """Flush from a background thread every ``interval`` seconds (call once per worker)."""
+        if not self.directory or (self._flusher is not None and self._flusher.is_alive()):
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.flush()
+
+        self._flusher = threading.Thread(target=loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def _sources(self):
+        own = self.snapshot()
+        if not self.directory:
+            return [(own, True)]
+        self.flush(own)
+        sources = []
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                with open(path) as f:
+                    sources.append((json.load(f), os.path.basename(path).startswith("worker-")))
+            except (OSError, ValueError):
+                continue
+        return sources
+
+    def render(self):
+        sources = self._sources()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples(_merge(metric, sources)):
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
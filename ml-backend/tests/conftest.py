@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The backend modules are imported as top-level modules, as gunicorn/uvicorn do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# main with the stub models from bench/stubs.py; main itself still imports the real libraries
+@pytest.fixture(scope="session")
+def app_main():
+    for name in ("torch", "transformers", "spacy"):
+        pytest.importorskip(name)
+    import main
+    from bench import stubs
+
+    stubs.install(main)
+    return main
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+from answers import Answer, align_answer, select_answers
+
+CONTEXT = (
+    "The mitochondria is the powerhouse of the cell. "
+    "It produces adenosine triphosphate through cellular respiration."
+)
+
+
+def chunk(text, pos="NOUN"):
+    return SimpleNamespace(text=text, root=SimpleNamespace(pos_=pos))
+
+
+def test_select_answers_keeps_root_pos_and_dedupes():
+    answers = select_answers([chunk("It", "PRON"), chunk("the cell"), chunk("The Cell")], 3)
+    assert answers == ["It", "the cell"]
+    assert [a.root_pos for a in answers] == ["PRON", "NOUN"]
+
+
+def test_select_answers_skips_long_chunks_and_honours_seen():
+    seen = {"the cell"}
+    answers = select_answers([chunk("a b c d e f"), chunk("the cell"), chunk("respiration")], 2, seen)
+    assert answers == ["respiration"]
+    assert "respiration" in seen
+
+
+def test_align_answer_accepts_content_span():
+    answer = Answer("the mitochondria", "NOUN")
+    assert align_answer(answer, "What is the powerhouse of the cell?", CONTEXT) == "The mitochondria"
+
+
+def test_align_answer_rejects_pronoun_and_determiner_spans():
+    question = "What produces adenosine triphosphate through cellular respiration?"
+    assert align_answer(Answer("It", "PRON"), question, CONTEXT) is None
+    assert align_answer(Answer("They", "PRON"), question, "They produce adenosine triphosphate.") is None
+    assert align_answer(Answer("this", "DET"), question, "This produces adenosine triphosphate.") is None
+
+
+def test_align_answer_matches_whole_words_only():
+    # "it" must not be found inside "mitochondria"
+    assert align_answer(Answer("it", "NOUN"), "What is the powerhouse?", "The mitochondria is the powerhouse.") is None
+    # "cell" inside "cellular" in the question does not count as giving the answer away
+    answer = Answer("the cell", "NOUN")
+    assert align_answer(answer, "Where does cellular respiration happen in the powerhouse?", CONTEXT) == "the cell"
+
+
+def test_align_answer_rejects_answer_given_away_by_question():
+    assert align_answer(Answer("the cell", "NOUN"), "What is the powerhouse of the cell?", CONTEXT) is None
+
+
+def test_align_answer_requires_question_about_the_span_sentence():
+    answer = Answer("adenosine triphosphate", "NOUN")
+    assert align_answer(answer, "What is the powerhouse of the cell?", CONTEXT) is None
+    assert align_answer(answer, "What does cellular respiration produce?", CONTEXT) == "adenosine triphosphate"
@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from batching import BatchScheduler
+
+
+def test_each_caller_gets_its_own_output():
+    batches = []
+
+    def run_batch(prompts):
+        batches.append(list(prompts))
+        return [p.upper() for p in prompts]
+
+    scheduler = BatchScheduler(run_batch, max_batch_size=4, max_wait_ms=20)
+    prompts = [f"prompt {i}" for i in range(10)]
+    with ThreadPoolExecutor(10) as pool:
+        outputs = list(pool.map(lambda p: scheduler.submit(p).result(timeout=5), prompts))
+
+    assert outputs == [p.upper() for p in prompts]
+    assert sorted(p for batch in batches for p in batch) == sorted(prompts)
+    assert all(len(batch) <= 4 for batch in batches)
+    assert scheduler.stats()["prompts"] == 10
+
+
+def test_concurrent_prompts_share_a_batch():
+    started, release = threading.Event(), threading.Event()
+    batches = []
+
+    def run_batch(prompts):
+        batches.append(len(prompts))
+        started.set()
+        release.wait(5)
+        return prompts
+
+    scheduler = BatchScheduler(run_batch, max_batch_size=8, max_wait_ms=0)
+    first = scheduler.submit("first")
+    assert started.wait(5)
+    # These queue up while the first batch is still running
+    rest = [scheduler.submit(str(i)) for i in range(5)]
+    release.set()
+
+    assert first.result(timeout=5) == "first"
+    assert [f.result(timeout=5) for f in rest] == [str(i) for i in range(5)]
+    assert batches == [1, 5]
+
+
+def test_map_preserves_order():
+    scheduler = BatchScheduler(lambda prompts: [p * 2 for p in prompts], max_batch_size=3)
+    assert scheduler.map(["a", "b", "c", "d"]) == ["aa", "bb", "cc", "dd"]
+
+
+def test_failed_batch_raises_for_every_caller():
+    gate = threading.Event()
+
+    def run_batch(prompts):
+        gate.wait(5)
+        raise RuntimeError("generation failed")
+
+    scheduler = BatchScheduler(run_batch, max_batch_size=8, max_wait_ms=50)
+    futures = [scheduler.submit(str(i)) for i in range(3)]
+    gate.set()
+    for future in futures:
+        with pytest.raises(RuntimeError, match="generation failed"):
+            future.result(timeout=5)
+
+    # The scheduler keeps serving after a failure
+    scheduler.run_batch = lambda prompts: prompts
+    assert scheduler.submit("ok").result(timeout=5) == "ok"
+    assert scheduler.stats()["batches"] == 1
+
+
+def test_time_waiting_for_a_batch_is_observed():
+    started, release = threading.Event(), threading.Event()
+    waits = []
+
+    def run_batch(prompts):
+        started.set()
+        release.wait(5)
+        return prompts
+
+    scheduler = BatchScheduler(run_batch, max_batch_size=8, max_wait_ms=0, observe=waits.append)
+    first = scheduler.submit("first")
+    assert started.wait(5)
+    # This one waits behind the running batch
+    second = scheduler.submit("second")
+    time.sleep(0.05)
+    release.set()
+    assert [first.result(timeout=5), second.result(timeout=5)] == ["first", "second"]
+
+    assert len(waits) == 2
+    assert waits[1] >= 0.05
+    assert scheduler.stats()["avg_wait_ms"] >= 25
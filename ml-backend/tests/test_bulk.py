@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from bench.stubs import StubPipeline
+
+MITOCHONDRIA = "Mitochondria produce energy. Zebra herds roam across Africa."
+VOLCANO = "Volcano vents release Magma onto the surface of the Earth."
+KABOOM = "Kaboom is a word that breaks question generation for this text."
+
+
+class FailingPipeline(StubPipeline):
+    """Stub pipeline whose whole batch fails if any prompt matches ``fails``."""
+
+    def __init__(self, fails):
+        super().__init__()
+        self.fails = fails
+        self.threads = set()
+
+    def __call__(self, prompts, **kwargs):
+        self.threads.add(threading.current_thread().name)
+        if any(self.fails(p) for p in prompts):
+            raise RuntimeError("generation failed")
+        return super().__call__(prompts, **kwargs)
+
+
+@pytest.fixture(params=[True, False], ids=["batching", "no-batching"])
+def bulk(request, app_main, monkeypatch):
+    monkeypatch.setattr(app_main, "BATCHING", request.param)
+    monkeypatch.setattr(app_main, "ANSWER_MODE", "qa")
+
+    def run(texts, fails, num=2):
+        pipe = FailingPipeline(fails)
+        monkeypatch.setattr(app_main, "get_qa_qg_pipeline", lambda backend=None: pipe)
+        result = app_main.bulk_flashcards(texts, num)["results"]
+        if request.param:
+            # Retries go through the batchers too, so only their threads call torch
+            assert all(name.endswith("-scheduler") for name in pipe.threads)
+        return result
+
+    return run
+
+
+def test_all_texts_get_cards_in_input_order(bulk):
+    results = bulk([MITOCHONDRIA, VOLCANO], fails=lambda p: False)
+    assert [c["question"] for c in results[0]["flashcards"]] == ["What is Mitochondria?", "What is Zebra?"]
+    assert [c["question"] for c in results[1]["flashcards"]] == ["What is Volcano?", "What is Magma?"]
+
+
+def test_failing_question_prompt_only_fails_its_text(bulk):
+    results = bulk(
+        [MITOCHONDRIA, KABOOM, VOLCANO],
+        fails=lambda p: p.startswith("generate question:") and "Kaboom is" in p,
+    )
+    assert results[1] == {"error": "generation failed"}
+    assert len(results[0]["flashcards"]) == 2
+    assert [c["answer"] for c in results[2]["flashcards"]] == ["Volcano", "Volcano"]
+
+
+def test_failing_answer_after_a_sibling_card_fails_the_whole_text(bulk):
+    results = bulk(
+        [VOLCANO, MITOCHONDRIA],
+        fails=lambda p: p.startswith("question: What is Zebra?"),
+    )
+    # The Mitochondria card succeeded, but a text is all or nothing
+    assert results[1] == {"error": "generation failed"}
+    assert [c["question"] for c in results[0]["flashcards"]] == ["What is Volcano?", "What is Magma?"]
+
+
+def test_out_of_range_texts_are_reported_in_place(bulk):
+    results = bulk(["too short", VOLCANO, "x" * 501], fails=lambda p: False)
+    assert results[0] == {"error": "text must be between 10 and 500 characters"}
+    assert results[2] == results[0]
+    assert len(results[1]["flashcards"]) == 2
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from cache import ResultCache, make_key
+
+
+def test_make_key_normalizes_whitespace_and_separates_models():
+    assert make_key(" a  b\n", 1, "m") == make_key("a b", 1, "m")
+    assert make_key("a b", 1, "m") != make_key("a b", 2, "m")
+    assert make_key("a b", 1, "m") != make_key("a b", 1, "other")
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = ResultCache()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {"flashcards": []}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    # Wait for every follower to join the in-flight computation before finishing it
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(r is results[0] for r in results)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == 4
+    assert cache.get_or_compute("k", compute) is results[0]
+    assert cache.stats()["hits"] == 1
+
+
+def test_claim_reports_hit_follower_and_leader():
+    cache = ResultCache()
+    value, future, leader = cache.claim("k")
+    assert value is None and leader
+    _, follower_future, follower_leader = cache.claim("k")
+    assert follower_future is future and not follower_leader
+
+    cache.compute("k", lambda: 42)
+    assert future.result() == 42
+    assert cache.claim("k") == (42, None, False)
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = ResultCache()
+    _, future, _ = cache.claim("k")
+    _, follower, _ = cache.claim("k")
+
+    with pytest.raises(ValueError):
+        cache.compute("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    with pytest.raises(ValueError):
+        follower.result()
+
+    # The next caller computes again instead of getting the failure
+    assert cache.get_or_compute("k", lambda: "ok") == "ok"
+    assert cache.stats()["misses"] == 2
+
+
+def test_fail_releases_waiters_without_computing():
+    cache = ResultCache()
+    cache.claim("k")
+    _, follower, _ = cache.claim("k")
+    cache.fail("k", RuntimeError("rejected"))
+    with pytest.raises(RuntimeError):
+        follower.result()
+    assert cache.get_or_compute("k", lambda: 1) == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("cache.time.monotonic", lambda: now[0])
+    cache = ResultCache(ttl_seconds=10)
+    cache.get_or_compute("k", lambda: "first")
+
+    now[0] += 9
+    assert cache.get_or_compute("k", lambda: "second") == "first"
+    now[0] += 2
+    assert cache.get_or_compute("k", lambda: "second") == "second"
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.get_or_compute("a", lambda: "a")
+    cache.get_or_compute("b", lambda: "b")
+    cache.get_or_compute("a", lambda: "unused")  # touch a so b is the oldest
+    cache.get_or_compute("c", lambda: "c")
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get_or_compute("a", lambda: "recomputed") == "a"
+    assert cache.get_or_compute("b", lambda: "recomputed") == "recomputed"
+
+
+def test_zero_max_entries_disables_storage():
+    cache = ResultCache(max_entries=0)
+    cache.get_or_compute("k", lambda: 1)
+    assert cache.stats()["entries"] == 0
+    assert cache.get_or_compute("k", lambda: 2) == 2
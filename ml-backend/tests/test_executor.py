@@ -0,0 +1,150 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from executor import InferenceExecutor, Overloaded, overloaded_response, server_timing
+
+
+def test_run_returns_result_and_timing():
+    observed = []
+    executor = InferenceExecutor(concurrency=1, max_queue=0, observe=lambda q, c: observed.append((q, c)))
+    result, timing = asyncio.run(executor.run(lambda a, b: a + b, 2, 3))
+
+    assert result == 5
+    assert set(timing) == {"queue", "compute"}
+    assert len(observed) == 1
+    assert executor.stats()["completed"] == 1
+    assert executor.stats()["in_flight"] == 0
+    assert server_timing({"queue": 0.001, "compute": 0.25}) == "queue;dur=1.0, compute;dur=250.0"
+
+
+def test_full_executor_rejects_with_retry_after():
+    executor = InferenceExecutor(concurrency=1, max_queue=1, retry_after=7)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as info:
+            await executor.run(lambda: None)
+        release.set()
+        await asyncio.gather(*running)
+        return info.value
+
+    exc = asyncio.run(scenario())
+    assert exc.retry_after == 7
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["in_flight"] == 0
+
+    response = overloaded_response(exc)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert json.loads(response.body) == {"error": "Server is busy, retry later"}
+
+
+def test_slot_released_when_job_fails():
+    executor = InferenceExecutor(concurrency=1, max_queue=0)
+
+    def boom():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run(boom))
+    assert executor.stats()["in_flight"] == 0
+    assert asyncio.run(executor.run(lambda: "next"))[0] == "next"
+
+
+def test_slot_released_when_caller_is_cancelled():
+    executor = InferenceExecutor(concurrency=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+
+    def job():
+        started.set()
+        release.wait(5)
+
+    async def scenario():
+        task = asyncio.ensure_future(executor.run(job))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The job is still running on the pool, so it keeps its slot until it ends
+        assert executor.stats()["in_flight"] == 1
+        release.set()
+
+    asyncio.run(scenario())
+    executor._pool.shutdown(wait=True)
+    assert executor.stats()["in_flight"] == 0
+
+
+def test_iterate_releases_slot_when_stream_stops_early():
+    executor = InferenceExecutor(concurrency=1, max_queue=0)
+
+    async def scenario():
+        executor.acquire()
+        stream = executor.iterate(iter(range(10)))
+        assert await stream.__anext__() == 0
+        await stream.aclose()
+
+    asyncio.run(scenario())
+    assert executor.stats()["in_flight"] == 0
+
+
+def test_iterate_records_stream_timing():
+    observed = []
+    executor = InferenceExecutor(concurrency=1, max_queue=0, observe=lambda q, c: observed.append((q, c)))
+
+    async def scenario():
+        executor.acquire()
+        return [item async for item in executor.iterate(iter("abc"))]
+
+    assert asyncio.run(scenario()) == ["a", "b", "c"]
+    assert len(observed) == 1
+    stats = executor.stats()
+    assert stats["completed"] == 1 and stats["in_flight"] == 0
+
+
+def _stream_scope():
+    return {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "method": "GET", "path": "/"}
+
+
+async def _receive():
+    await asyncio.Event().wait()
+
+
+def test_stream_that_never_starts_releases_slot():
+    executor = InferenceExecutor(concurrency=1, max_queue=0)
+
+    async def send(message):
+        raise OSError("client went away")
+
+    async def scenario():
+        response = executor.stream(iter(["a", "b"]))
+        assert executor.stats()["in_flight"] == 1
+        with pytest.raises(Exception):
+            await response(_stream_scope(), _receive, send)
+
+    asyncio.run(scenario())
+    assert executor.stats()["in_flight"] == 0
+    assert executor.stats()["completed"] == 0
+
+
+def test_stream_releases_slot_once_when_finished():
+    executor = InferenceExecutor(concurrency=1, max_queue=0)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def scenario():
+        response = executor.stream(iter(["a", "b"]))
+        with pytest.raises(Overloaded):
+            executor.stream(iter([]))
+        await response(_stream_scope(), _receive, send)
+
+    asyncio.run(scenario())
+    assert [m.get("body") for m in sent[1:]] == [b"a", b"b", b""]
+    assert executor.stats()["in_flight"] == 0
+    assert executor.stats()["completed"] == 1
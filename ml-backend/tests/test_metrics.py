@@ -0,0 +1,126 @@
+import json
+import os
+
+from metrics import Registry, mark_process_dead
+
+
+def samples(text):
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            out[name] = float(value)
+    return out
+
+
+def make_registry(directory=None):
+    registry = Registry(directory=directory)
+    requests = registry.counter("requests_total", "Requests", ["status"])
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    state = {"in_flight": 0, "load": None}
+    registry.gauge("in_flight", "In flight", lambda: state["in_flight"])
+    registry.gauge("load_seconds", "Load", lambda: state["load"], aggregate="max")
+    return registry, requests, latency, state
+
+
+# Another worker's snapshot, written the way Registry.flush writes it
+def write_worker(directory, pid, registry):
+    with open(os.path.join(directory, f"worker-{pid}-0000.json"), "w") as f:
+        json.dump(registry.snapshot(), f)
+
+
+def test_exposition_format():
+    registry, requests, latency, _ = make_registry()
+    requests.inc(status="200")
+    requests.inc(2, status='bad"quote')
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert text.endswith("\n")
+    assert "# HELP latency_seconds Latency\n# TYPE latency_seconds histogram\n" in text
+    assert "# TYPE requests_total counter" in text
+    assert "# TYPE in_flight gauge" in text
+    values = samples(text)
+    assert values['requests_total{status="200"}'] == 1
+    assert values['requests_total{status="bad\\"quote"}'] == 2
+    # Buckets are cumulative and end with +Inf, which equals _count
+    assert values['latency_seconds_bucket{le="0.1"}'] == 1
+    assert values['latency_seconds_bucket{le="1.0"}'] == 3
+    assert values['latency_seconds_bucket{le="+Inf"}'] == 4
+    assert values["latency_seconds_count"] == 4
+    assert abs(values["latency_seconds_sum"] - 4.25) < 1e-9
+    # Gauges that read None are left out
+    assert "load_seconds" not in values
+
+
+def test_workers_are_merged(tmp_path):
+    directory = str(tmp_path)
+    registry, requests, latency, state = make_registry(directory)
+    other, other_requests, other_latency, other_state = make_registry()
+
+    requests.inc(status="200")
+    latency.observe(0.05)
+    state.update(in_flight=2, load=3.0)
+    other_requests.inc(5, status="200")
+    other_requests.inc(status="503")
+    other_latency.observe(2.0)
+    other_state.update(in_flight=1, load=7.0)
+    write_worker(directory, 4242, other)
+
+    values = samples(registry.render())
+    # Counters and histograms are summed
+    assert values['requests_total{status="200"}'] == 6
+    assert values['requests_total{status="503"}'] == 1
+    assert values['latency_seconds_bucket{le="0.1"}'] == 1
+    assert values['latency_seconds_bucket{le="+Inf"}'] == 2
+    assert values["latency_seconds_count"] == 2
+    # Gauges: sum by default, max where asked
+    assert values["in_flight"] == 3
+    assert values["load_seconds"] == 7.0
+    # Rendering flushed this worker's own snapshot next to the other one
+    assert len([n for n in os.listdir(directory) if n.startswith("worker-")]) == 2
+
+
+def test_dead_workers_keep_counters_but_not_gauges(tmp_path):
+    directory = str(tmp_path)
+    registry, requests, _, state = make_registry(directory)
+    other, other_requests, other_latency, other_state = make_registry()
+    requests.inc(status="200")
+    state.update(in_flight=1, load=1.0)
+    other_requests.inc(4, status="200")
+    other_latency.observe(0.5)
+    other_state.update(in_flight=5, load=9.0)
+    write_worker(directory, 4242, other)
+
+    mark_process_dead(directory, 4242)
+    assert "dead-4242-0000.json" in os.listdir(directory)
+
+    values = samples(registry.render())
+    assert values['requests_total{status="200"}'] == 5
+    assert values["latency_seconds_count"] == 1
+    assert values["in_flight"] == 1
+    assert values["load_seconds"] == 1.0
+
+
+def test_unreadable_snapshots_are_skipped(tmp_path):
+    directory = str(tmp_path)
+    registry, requests, _, _ = make_registry(directory)
+    requests.inc(status="200")
+    (tmp_path / "worker-1-half.json").write_text('{"requests_total": [[["200"], ')
+
+    assert samples(registry.render())['requests_total{status="200"}'] == 1
+
+
+def test_counter_gauges_are_summed_across_dead_workers(tmp_path):
+    directory = str(tmp_path)
+    registry = Registry(directory=directory)
+    registry.gauge("rejected_total", "Rejected", lambda: 2, kind="counter")
+    other = Registry()
+    other.gauge("rejected_total", "Rejected", lambda: 3, kind="counter")
+    write_worker(directory, 4242, other)
+    mark_process_dead(directory, 4242)
+
+    text = registry.render()
+    assert "# TYPE rejected_total counter" in text
+    assert samples(text)["rejected_total"] == 5
@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import pytest
+
+
+def asgi_post(app, path, body, send):
+    payload = json.dumps(body).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    return app(scope, receive, send)
+
+
+def test_stream_disconnected_before_first_chunk_releases_slot(app_main):
+    async def send(message):
+        raise OSError("client went away")
+
+    text = "The Sun is a star. The Earth orbits the Sun once a year."
+    for _ in range(3):
+        with pytest.raises(Exception):
+            asyncio.run(asgi_post(app_main.app, "/generate/stream", {"text": text}, send))
+    assert app_main.inference.stats()["in_flight"] == 0
+
+
+def test_blocks_are_cut_at_line_or_sentence_ends(app_main):
+    text = "One two. Three four\nFive six seven eight"
+    blocks = list(app_main.iter_blocks(text, 12))
+    assert blocks == ["One two.", " Three four\n", "Five six sev", "en eight"]
+    assert "".join(blocks) == text
+
+
+def test_max_cards_is_a_cap_across_windows(app_main, monkeypatch):
+    monkeypatch.setattr(app_main, "STREAM_WINDOW_CHARS", 40)
+    text = " ".join(f"Topic{i} meets Subject{i} here." for i in range(10))
+    cards = list(app_main.stream_flashcards(text, max_cards=5, cards_per_window=2))
+    assert len(cards) == 5
+    assert [c["window"] for c in cards] == [0, 0, 1, 1, 2]
+
+
+def test_answers_are_not_repeated_across_windows(app_main, monkeypatch):
+    monkeypatch.setattr(app_main, "STREAM_WINDOW_CHARS", 40)
+    text = "Alpha is first here. Alpha is first again. Beta comes next."
+    cards = list(app_main.stream_flashcards(text, max_cards=10, cards_per_window=1))
+    # Window 1 repeats Alpha, so its one card goes to Beta instead
+    assert [c["question"] for c in cards] == ["What is Alpha?", "What is Beta?"]
+    assert [c["window"] for c in cards] == [0, 1]
+
+
+def test_answers_cut_off_by_the_context_limit_are_skipped(app_main, monkeypatch):
+    monkeypatch.setattr(app_main, "STREAM_WINDOW_CHARS", 50)
+    text = "Alpha " + "word " * 40 + "Omega ends it."
+    cards = list(app_main.stream_flashcards(text, max_cards=10, cards_per_window=2))
+    assert [c["question"] for c in cards] == ["What is Alpha?"]